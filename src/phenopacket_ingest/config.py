@@ -23,6 +23,12 @@ class PhenopacketStoreConfig:
     release_tag: Optional[str] = None
     timeout: float = 30.0
 
+    shard_by_cohort: bool = False
+    compress_output: bool = False
+
+    # Worker processes for the Koza transform; 0 or 1 transforms rows in the main process
+    transform_workers: int = 0
+
     def __post_init__(self):
         """Initialize from environment variables if available."""
         self.repo_owner = os.environ.get("PHENOPACKET_REPO_OWNER", self.repo_owner)
@@ -31,6 +37,13 @@ class PhenopacketStoreConfig:
         self.output_dir = os.environ.get("PHENOPACKET_OUTPUT_DIR", self.output_dir)
         self.release_tag = os.environ.get("PHENOPACKET_RELEASE_TAG", self.release_tag)
         self.timeout = float(os.environ.get("PHENOPACKET_DOWNLOAD_TIMEOUT", str(self.timeout)))
+        self.shard_by_cohort = os.environ.get(
+            "PHENOPACKET_SHARD_BY_COHORT", str(self.shard_by_cohort)
+        ).lower() in ("1", "true", "yes")
+        self.compress_output = os.environ.get(
+            "PHENOPACKET_COMPRESS_OUTPUT", str(self.compress_output)
+        ).lower() in ("1", "true", "yes")
+        self.transform_workers = int(os.environ.get("PHENOPACKET_TRANSFORM_WORKERS", str(self.transform_workers)))
 
 
 def get_config() -> PhenopacketStoreConfig:
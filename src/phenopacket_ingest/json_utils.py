@@ -0,0 +1,24 @@
+"""
+JSON helpers for phenopacket-ingest.
+
+This module decodes JSON with orjson when it is installed and falls back to
+the standard library otherwise, so hot parse paths get the faster decoder
+without making it a hard dependency.
+"""
+
+import json
+from typing import Any, Callable, Union
+
+HAS_ORJSON = False
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    pass
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause covers both decoders
+JSONDecodeError = json.JSONDecodeError
+
+# Decode JSON text or UTF-8 bytes
+loads: Callable[[Union[str, bytes, bytearray]], Any] = orjson.loads if HAS_ORJSON else json.loads
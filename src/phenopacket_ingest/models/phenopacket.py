@@ -9,8 +9,9 @@ from datetime import datetime
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import BaseModel, Field, model_validator, validator
+from pydantic import BaseModel, Field, field_validator, model_validator, validator
 
+from phenopacket_ingest import json_utils
 from phenopacket_ingest.models.metadata import MetaData
 from phenopacket_ingest.models.ontology import OntologyClass
 
@@ -385,6 +386,33 @@ class PhenopacketRecord(BaseModel):
     variant_hgvs: List[str] = Field(default_factory=list)
     interpretation_status: Optional[str] = None
 
+    @field_validator(
+        "phenotypic_features",
+        "observed_phenotypes",
+        "excluded_phenotypes",
+        "biosamples",
+        "measurements",
+        "medical_actions",
+        "files",
+        "diseases",
+        "interpretations",
+        "meta_data",
+        "external_references",
+        "variant_hgvs",
+        "pmids",
+        mode='before',
+    )
+    @classmethod
+    def decode_json_string(cls, v):
+        """Decode fields that arrive serialized as JSON strings (e.g. from flat JSONL/TSV rows)."""
+        if isinstance(v, str) and v:
+            try:
+                return json_utils.loads(v)
+            except json_utils.JSONDecodeError:
+                # If it's not valid JSON, leave as is
+                return v
+        return v
+
     @model_validator(mode='after')
     def process_nested_objects(self):
         """Process nested objects to ensure proper structure."""
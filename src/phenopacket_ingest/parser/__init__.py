@@ -5,10 +5,12 @@ This module contains classes for parsing phenopacket protocol buffer objects
 into Python objects and extracting data for transformation.
 """
 
+from phenopacket_ingest.parser.jsonl_writer import PhenopacketJsonlWriter
 from phenopacket_ingest.parser.phenopacket_extractor import PhenopacketExtractor
 from phenopacket_ingest.parser.phenopacket_parser import PhenopacketParser
 
 __all__ = [
     "PhenopacketParser",
     "PhenopacketExtractor",
+    "PhenopacketJsonlWriter",
 ]
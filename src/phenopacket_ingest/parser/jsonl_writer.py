@@ -0,0 +1,121 @@
+"""
+JSONL writer for extracted phenopacket records.
+
+This module writes serialized phenopacket records either to a single JSONL
+file or to one shard per cohort, so downstream transforms can read shards
+in parallel. Output can be gzip-compressed, which Koza reads transparently.
+"""
+
+import gzip
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, TextIO
+
+SHARD_BUFFER_SIZE = 1 << 20
+GZIP_COMPRESS_LEVEL = 6
+
+
+class PhenopacketJsonlWriter:
+    """
+    Writer for phenopacket JSONL output.
+
+    When sharding by cohort, records go to ``<stem>.<cohort>.jsonl`` next to the
+    output path. On a clean close the shards are concatenated into the output
+    path (so single-file consumers keep working) and a ``<stem>.manifest.json``
+    listing the shards and their record counts is written.
+
+    Only one shard is open at a time: records are expected to arrive grouped by
+    cohort, and a cohort that comes back later is appended to its existing shard.
+
+    With ``compress`` (or an output path ending in ``.gz``) the combined file and
+    every shard are gzip-compressed. Koza detects gzip by content, so compressed
+    output can keep the plain ``.jsonl`` name a transform config points at.
+    Compressed shards are gzip members, so concatenating them still yields a
+    valid gzip file.
+    """
+
+    def __init__(self, output_path: Path, shard_by_cohort: bool = False, compress: bool = False):
+        """
+        Initialize the writer.
+
+        Args:
+            output_path: Path for the combined JSONL file
+            shard_by_cohort: Write one JSONL shard per cohort
+            compress: Gzip-compress the output; implied by an output path ending in ``.gz``
+
+        """
+        self.output_path = output_path
+        self.shard_by_cohort = shard_by_cohort
+        self.compress = compress or output_path.suffix == ".gz"
+        self._base_path = output_path.with_suffix("") if output_path.suffix == ".gz" else output_path
+        self.record_counts: Dict[str, int] = {}
+        self._file: Optional[TextIO] = None
+        self._file_cohort: Optional[str] = None
+
+    def __enter__(self) -> "PhenopacketJsonlWriter":
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.shard_by_cohort:
+            self._file = self._open(self.output_path)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        if self.shard_by_cohort and exc_type is None:
+            self._merge_shards()
+
+    def shard_path(self, cohort_name: str) -> Path:
+        """Get the shard path for a cohort."""
+        base = self._base_path
+        return base.with_name(f"{base.stem}.{cohort_name}{base.suffix}{'.gz' if self.compress else ''}")
+
+    @property
+    def manifest_path(self) -> Path:
+        """Path of the manifest written alongside sharded output."""
+        return self._base_path.with_name(f"{self._base_path.stem}.manifest.json")
+
+    def _open(self, path: Path, mode: str = "w") -> TextIO:
+        """Open an output file for text writing (``w``) or appending (``a``), compressed if configured."""
+        if self.compress:
+            return gzip.open(path, f"{mode}t", compresslevel=GZIP_COMPRESS_LEVEL)
+        return open(path, mode, buffering=SHARD_BUFFER_SIZE)
+
+    def write(self, line: str, cohort_name: str) -> None:
+        """
+        Write a serialized record.
+
+        Args:
+            line: A JSON-serialized record without trailing newline
+            cohort_name: Cohort the record belongs to
+
+        """
+        if self.shard_by_cohort and cohort_name != self._file_cohort:
+            if self._file is not None:
+                self._file.close()
+            mode = "a" if cohort_name in self.record_counts else "w"
+            self._file = self._open(self.shard_path(cohort_name), mode)
+            self._file_cohort = cohort_name
+
+        self._file.write(line + "\n")
+        self.record_counts[cohort_name] = self.record_counts.get(cohort_name, 0) + 1
+
+    def _merge_shards(self) -> None:
+        """Concatenate the cohort shards into the output path and write the manifest."""
+        shards = []
+        with open(self.output_path, "wb") as out:
+            for cohort_name, count in self.record_counts.items():
+                shard_path = self.shard_path(cohort_name)
+                with open(shard_path, "rb") as shard:
+                    shutil.copyfileobj(shard, out, SHARD_BUFFER_SIZE)
+                shards.append({"cohort": cohort_name, "path": shard_path.name, "records": count})
+
+        manifest = {
+            "output": self.output_path.name,
+            "records": sum(self.record_counts.values()),
+            "shards": shards,
+        }
+        with open(self.manifest_path, "w") as f:
+            json.dump(manifest, f, indent=2)
@@ -4,12 +4,20 @@ Phenopacket extraction module for processing phenopacket files.
 
 import json
 import logging
+import os
+import sqlite3
 import zipfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Optional
 
+from phenopacket_ingest import json_utils
+from phenopacket_ingest.parser.jsonl_writer import PhenopacketJsonlWriter
 from phenopacket_ingest.parser.phenopacket_parser import PhenopacketParser
 
+# Bump when the JSONL record layout or the cache schema changes so stale parse-cache entries are discarded.
+PARSE_CACHE_VERSION = 3
+
 
 class PhenopacketExtractor:
     """Extractor for phenopacket data from downloaded store."""
@@ -26,7 +34,15 @@ class PhenopacketExtractor:
         self.parser = PhenopacketParser(logger)
 
     def extract_to_jsonl(
-        self, zip_path: Path, output_path: Path, cohort_name: str = "unknown", force: bool = False
+        self,
+        zip_path: Path,
+        output_path: Path,
+        cohort_name: str = "unknown",
+        force: bool = False,
+        cache_path: Optional[Path] = None,
+        strict: bool = False,
+        shard_by_cohort: bool = False,
+        compress: bool = False,
     ) -> Path:
         """
         Extract phenopacket data to JSONL format.
@@ -36,6 +52,15 @@ class PhenopacketExtractor:
             output_path: Path for the output JSONL file
             cohort_name: Default cohort name if not determinable from file paths
             force: Force re-extraction even if output file exists
+            cache_path: Optional SQLite file caching converted records by cohort, file name,
+                CRC and size (separately for strict and non-strict runs), so entries unchanged
+                between releases are not re-parsed on later runs; entries not in this archive
+                are evicted at the end of the run
+            strict: Always parse through the phenopacket protobuf schema instead of
+                reading the JSON directly
+            shard_by_cohort: Also write one JSONL shard per cohort plus a manifest
+                (see PhenopacketJsonlWriter)
+            compress: Gzip-compress the output even if output_path does not end in .gz
 
         Returns:
             Path to the generated JSONL file
@@ -56,54 +81,225 @@ class PhenopacketExtractor:
 
         self.logger.info(f"Extracting phenopacket data from {zip_path} to {output_path}")
 
-        with zipfile.ZipFile(zip_path) as zf, open(output_path, "w") as f:
-            phenopacket_files = [
-                name for name in zf.namelist() if name.endswith('.json') and not name.startswith('__MACOSX')
-            ]
+        cache_hits = 0
+        seen_keys = []
+
+        with (
+            self._parse_cache(cache_path) as cache,
+            self.open_archive(zip_path) as zf,
+            PhenopacketJsonlWriter(output_path, shard_by_cohort, compress) as writer,
+        ):
+            phenopacket_infos = self._list_phenopacket_entries(zf)
 
-            total_files = len(phenopacket_files)
+            total_files = len(phenopacket_infos)
             self.logger.info(f"Found {total_files} phenopacket files to process")
+            log_progress = self.logger.isEnabledFor(logging.INFO)
 
-            for i, pp_file in enumerate(phenopacket_files):
-                if i % 100 == 0:
+            for i, zi in enumerate(phenopacket_infos):
+                if log_progress and i % 100 == 0:
                     self.logger.info(f"Processing file {i + 1}/{total_files}")
 
-                parts = pp_file.split('/')
-                file_cohort_name = parts[0] if len(parts) > 1 else cohort_name
+                # Cohort is the directory holding the file (a release ZIP nests cohorts under a release folder)
+                parts = zi.filename.split('/')
+                file_cohort_name = parts[-2] if len(parts) > 1 else cohort_name
+
+                if cache is not None:
+                    # Keyed without the release folder, so an unchanged entry is reused by later releases.
+                    # Records converted by the unvalidated JSON fast path must not satisfy a strict run.
+                    cache_key = (strict, file_cohort_name, parts[-1], zi.CRC, zi.file_size)
+                    seen_keys.append(cache_key)
+                    row = cache.execute(
+                        "SELECT jsonl FROM parsecache "
+                        "WHERE strict = ? AND cohort = ? AND filename = ? AND crc = ? AND size = ?",
+                        cache_key,
+                    ).fetchone()
+                    if row:
+                        writer.write(row[0], file_cohort_name)
+                        cache_hits += 1
+                        continue
 
                 try:
-                    pp_content = zf.read(pp_file).decode('utf-8')
-                    phenopacket = Parse(pp_content, PBPhenopacket())
-
-                    self._process_phenopacket(phenopacket, f, file_cohort_name)
+                    with zf.open(zi) as ef:
+                        pp_content = ef.read()
+
+                    line = None
+                    if not strict:
+                        line = self._process_phenopacket_json(pp_content, file_cohort_name)
+                    if line is None:
+                        phenopacket = Parse(pp_content, PBPhenopacket())
+                        line = self._process_phenopacket(phenopacket, file_cohort_name)
+                    if line is None:
+                        continue
+
+                    writer.write(line, file_cohort_name)
+                    if cache is not None:
+                        cache.execute("INSERT OR REPLACE INTO parsecache VALUES (?, ?, ?, ?, ?, ?)", (*cache_key, line))
 
                 except Exception as e:
-                    self.logger.error(f"Error processing {pp_file}: {e}")
+                    self.logger.error(f"Error processing {zi.filename}: {e}")
+
+            if cache is not None:
+                self.logger.info(f"Reused {cache_hits}/{total_files} records from parse cache {cache_path}")
+                self._evict_unseen(cache, strict, seen_keys)
 
         self.logger.info(f"Extraction complete. JSONL file written to {output_path}")
         return output_path
 
-    def _process_phenopacket(self, phenopacket, output_file, cohort_name: str) -> None:
+    @staticmethod
+    @contextmanager
+    def _parse_cache(cache_path: Optional[Path]) -> Iterator[Optional[sqlite3.Connection]]:
+        """
+        Open (and initialise if needed) the SQLite parse cache.
+
+        Pending inserts are committed in a single transaction when the block exits.
+
+        Args:
+            cache_path: Path to the SQLite database file, or None to disable caching
+
+        Yields:
+            An open connection with the parsecache table in place, or None
+
+        """
+        if cache_path is None:
+            yield None
+            return
+
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(cache_path)
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != PARSE_CACHE_VERSION:
+                conn.execute("DROP TABLE IF EXISTS parsecache")
+                conn.execute(f"PRAGMA user_version = {PARSE_CACHE_VERSION}")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS parsecache (strict INTEGER, cohort TEXT, filename TEXT, crc INTEGER, "
+                "size INTEGER, jsonl TEXT, PRIMARY KEY (strict, cohort, filename, crc, size))"
+            )
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _evict_unseen(cache: sqlite3.Connection, strict: bool, seen_keys: List[tuple]) -> None:
+        """
+        Delete parse-cache entries that were not part of the archive just extracted.
+
+        This keeps the cache to one copy of the store (per mode) instead of growing with every release.
+
+        Args:
+            cache: Open parse-cache connection
+            strict: Mode of the run; entries cached by the other mode are left alone
+            seen_keys: Cache keys of every entry in the archive
+
+        """
+        cache.execute("CREATE TEMP TABLE seen (strict INTEGER, cohort TEXT, filename TEXT, crc INTEGER, size INTEGER)")
+        cache.executemany("INSERT INTO seen VALUES (?, ?, ?, ?, ?)", seen_keys)
+        cache.execute(
+            "DELETE FROM parsecache WHERE strict = ? AND (strict, cohort, filename, crc, size) NOT IN "
+            "(SELECT strict, cohort, filename, crc, size FROM seen)",
+            (strict,),
+        )
+        cache.execute("DROP TABLE seen")
+
+    @staticmethod
+    @contextmanager
+    def open_archive(zip_path: Path) -> Iterator[zipfile.ZipFile]:
+        """
+        Open a ZIP archive for a sequential pass over its entries.
+
+        The kernel is told to expect sequential access so it can read ahead
+        aggressively while entries are consumed in header-offset order.
+
+        Args:
+            zip_path: Path to the ZIP file
+
+        Yields:
+            An open ZipFile
+
+        """
+        with open(zip_path, "rb") as fh:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            with zipfile.ZipFile(fh) as zf:
+                yield zf
+
+    @staticmethod
+    def _list_phenopacket_entries(zf: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+        """
+        List the phenopacket JSON entries of a ZIP archive in on-disk order.
+
+        Entries are sorted by their local header offset so that reading them
+        in turn walks the archive sequentially instead of seeking back and forth.
+
+        Args:
+            zf: An open ZIP archive
+
+        Returns:
+            ZipInfo objects for the phenopacket files, ordered by header offset
+
+        """
+        infos = [
+            zi
+            for zi in zf.infolist()
+            if not zi.is_dir() and zi.filename.endswith('.json') and not zi.filename.startswith('__MACOSX')
+        ]
+        infos.sort(key=lambda zi: zi.header_offset)
+        return infos
+
+    def _process_phenopacket_json(self, pp_content: bytes, cohort_name: str) -> Optional[str]:
+        """
+        Process a single phenopacket straight from its JSON into a JSONL record.
+
+        This is the fast path that avoids building a protobuf message. Anything that
+        does not look like a phenopacket is left for the protobuf path to handle.
+
+        Args:
+            pp_content: Raw JSON bytes of the phenopacket
+            cohort_name: Cohort name for this phenopacket
+
+        Returns:
+            The serialized JSONL record (without newline), or None if the JSON was not usable
+
         """
-        Process a single phenopacket and write to JSONL.
+        try:
+            data = json_utils.loads(pp_content)
+        except json_utils.JSONDecodeError:
+            return None
+
+        if not isinstance(data, dict) or not data.get("id") or not isinstance(data.get("subject"), dict):
+            return None
+
+        record_dict = self.parser.phenopacket_json_to_jsonl_dict(data, cohort_name)
+        if not record_dict:
+            return None
+
+        return json.dumps(record_dict)
+
+    def _process_phenopacket(self, phenopacket, cohort_name: str) -> Optional[str]:
+        """
+        Process a single phenopacket into a JSONL record.
 
         Args:
             phenopacket: A phenopacket protocol buffer object
-            output_file: File to write JSONL output to
             cohort_name: Cohort name for this phenopacket
 
+        Returns:
+            The serialized JSONL record (without newline), or None if no data was extracted
+
         """
         try:
             record_dict = self.parser.phenopacket_to_jsonl_dict(phenopacket, cohort_name)
 
             if record_dict:
-                output_file.write(json.dumps(record_dict) + "\n")
+                return json.dumps(record_dict)
             else:
                 self.logger.warning(f"No data extracted from phenopacket {getattr(phenopacket, 'id', 'unknown')}")
 
         except Exception as e:
             self.logger.error(f"Error processing phenopacket {getattr(phenopacket, 'id', 'unknown')}: {e}")
 
+        return None
+
     def process_jsonl_file(self, jsonl_path: Path, output_func) -> None:
         """
         Process a JSONL file containing phenopacket data.
@@ -115,9 +311,11 @@ class PhenopacketExtractor:
         """
         self.logger.info(f"Processing JSONL file: {jsonl_path}")
 
+        log_progress = self.logger.isEnabledFor(logging.INFO)
+
         with open(jsonl_path, 'r') as f:
             for i, line in enumerate(f):
-                if i % 1000 == 0:
+                if log_progress and i % 1000 == 0:
                     self.logger.info(f"Processed {i} records")
 
                 try:
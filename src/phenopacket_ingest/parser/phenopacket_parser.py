@@ -5,10 +5,13 @@ This module provides functionality to parse phenopacket protobuf objects
 into JSON-serializable dictionaries and Pydantic models.
 """
 
-import json
 import logging
+import re
 from typing import Any, Dict, Optional
 
+from phenopacket_ingest import json_utils
+from phenopacket_ingest.models import PhenopacketRecord
+
 PHENOPACKETS_AVAILABLE = False
 try:
     from google.protobuf.json_format import MessageToDict, Parse
@@ -18,6 +21,28 @@ try:
 except ImportError:
     logging.warning("phenopackets library not available. Functionality will be limited.")
 
+_CAMEL_WORD_BOUNDARY = re.compile('(.)([A-Z][a-z]+)')
+_CAMEL_LOWER_UPPER = re.compile('([a-z0-9])([A-Z])')
+
+# Protobuf enum numbers and names mapped to the values used in JSONL records
+SEX_BY_PROTOBUF_VALUE = {
+    "0": "UNKNOWN",
+    "1": "FEMALE",
+    "2": "MALE",
+    "3": "OTHER",
+    "UNKNOWN_SEX": "UNKNOWN",
+    "FEMALE": "FEMALE",
+    "MALE": "MALE",
+    "OTHER_SEX": "OTHER",
+}
+INTERPRETATION_STATUS_BY_PROTOBUF_VALUE = {
+    "0": "UNKNOWN_STATUS",
+    "1": "REJECTED",
+    "2": "CANDIDATE",
+    "3": "CONTRIBUTORY",
+    "4": "CAUSATIVE",
+}
+
 
 class PhenopacketParser:
     """
@@ -72,14 +97,54 @@ class PhenopacketParser:
         Returns:
             A dictionary with flattened phenopacket data or None if conversion fails
 
+        """
+        phenopacket_dict = self.phenopacket_to_dict(phenopacket)
+        if not phenopacket_dict:
+            return None
+
+        # Convert all camelCase keys to snake_case for consistency
+        phenopacket_dict = self.convert_dict_keys_to_snake_case(phenopacket_dict)
+        return self.phenopacket_dict_to_jsonl_dict(phenopacket_dict, cohort_name)
+
+    def phenopacket_json_to_jsonl_dict(self, data: Dict[str, Any], cohort_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Convert a decoded phenopacket JSON document to a flat dictionary suitable for JSONL export.
+
+        This skips the protobuf round trip: the JSON is used as-is, so it is not
+        validated against the phenopacket schema.
+
+        Args:
+            data: A phenopacket as decoded from its canonical JSON form
+            cohort_name: The name of the cohort this phenopacket belongs to
+
+        Returns:
+            A dictionary with flattened phenopacket data or None if conversion fails
+
         """
         try:
-            phenopacket_dict = self.phenopacket_to_dict(phenopacket)
-            if not phenopacket_dict:
-                return None
+            phenopacket_dict = self.convert_dict_keys_to_snake_case(data)
+            self._process_special_fields(phenopacket_dict)
+        except Exception as e:
+            self.logger.error(f"Error converting phenopacket JSON to dict: {e}")
+            return None
+
+        return self.phenopacket_dict_to_jsonl_dict(phenopacket_dict, cohort_name)
+
+    def phenopacket_dict_to_jsonl_dict(
+        self, phenopacket_dict: Dict[str, Any], cohort_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Flatten a phenopacket dictionary into the JSONL record layout.
+
+        Args:
+            phenopacket_dict: A phenopacket dictionary with snake_case keys
+            cohort_name: The name of the cohort this phenopacket belongs to
 
-            # Convert all camelCase keys to snake_case for consistency
-            phenopacket_dict = self.convert_dict_keys_to_snake_case(phenopacket_dict)
+        Returns:
+            A dictionary with flattened phenopacket data or None if conversion fails
+
+        """
+        try:
             phenopacket_dict["cohort"] = cohort_name
 
             result = {
@@ -223,17 +288,8 @@ class PhenopacketParser:
         if "subject" in pb_dict and "sex" in pb_dict["subject"]:
             sex_value = pb_dict["subject"]["sex"]
             if isinstance(sex_value, (int, str)):
-                sex_mapping = {
-                    "0": "UNKNOWN",
-                    "1": "FEMALE",
-                    "2": "MALE",
-                    "3": "OTHER",
-                    "UNKNOWN_SEX": "UNKNOWN",
-                    "FEMALE": "FEMALE",
-                    "MALE": "MALE",
-                    "OTHER_SEX": "OTHER",
-                }
-                pb_dict["subject"]["sex"] = sex_mapping.get(str(sex_value), str(sex_value))
+                sex_value = str(sex_value)
+                pb_dict["subject"]["sex"] = SEX_BY_PROTOBUF_VALUE.get(sex_value, sex_value)
 
         for interp in pb_dict.get("interpretations", []):
             if "diagnosis" in interp and "genomic_interpretations" in interp["diagnosis"]:
@@ -241,21 +297,13 @@ class PhenopacketParser:
                     if "interpretation_status" in gi:
                         status = gi["interpretation_status"]
                         if isinstance(status, (int, str)):
-                            status_mapping = {
-                                "0": "UNKNOWN_STATUS",
-                                "1": "REJECTED",
-                                "2": "CANDIDATE",
-                                "3": "CONTRIBUTORY",
-                                "4": "CAUSATIVE",
-                            }
-                            gi["interpretation_status"] = status_mapping.get(str(status), str(status))
+                            status = str(status)
+                            gi["interpretation_status"] = INTERPRETATION_STATUS_BY_PROTOBUF_VALUE.get(status, status)
 
     def camel_to_snake(self, name: str) -> str:
         """Convert camelCase string to snake_case."""
-        import re
-
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
-        return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
+        s1 = _CAMEL_WORD_BOUNDARY.sub(r'\1_\2', name)
+        return _CAMEL_LOWER_UPPER.sub(r'\1_\2', s1).lower()
 
     def convert_dict_keys_to_snake_case(self, obj: Any) -> Any:
         """Recursively convert all dictionary keys from camelCase to snake_case."""
@@ -272,8 +320,6 @@ class PhenopacketParser:
 
     def validate_against_model(self, data: Dict[str, Any]) -> None:
         """Validate data against the PhenopacketRecord model and print warnings for mismatches."""
-        from phenopacket_ingest.models import PhenopacketRecord
-
         model_fields = set(PhenopacketRecord.model_fields.keys())
         data_fields = set(data.keys())
 
@@ -314,7 +360,7 @@ class PhenopacketParser:
 
         """
         try:
-            data = json.loads(json_str)
+            data = json_utils.loads(json_str)
             converted_data = self.convert_dict_keys_to_snake_case(data)
             self.validate_against_model(converted_data)
             return converted_data
@@ -334,7 +380,7 @@ class PhenopacketParser:
 
         """
         try:
-            data = json.loads(jsonl_line)
+            data = json_utils.loads(jsonl_line)
             converted_data = self.convert_dict_keys_to_snake_case(data)
             self.validate_against_model(converted_data)
             return converted_data
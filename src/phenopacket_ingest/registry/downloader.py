@@ -5,6 +5,7 @@ This module provides functionality for downloading phenopacket data
 from GitHub repositories or other sources.
 """
 
+import functools
 import json
 import logging
 import os
@@ -19,6 +20,12 @@ import certifi
 from phenopacket_ingest.config import PhenopacketStoreConfig
 
 
+@functools.lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    """Build the certifi-backed SSL context once and reuse it for every request."""
+    return ssl.create_default_context(cafile=certifi.where())
+
+
 class VersionResolver:
     """Resolver for semantic versioning."""
 
@@ -86,7 +93,7 @@ class PhenopacketDownloader:
         """
         self.logger.info("Downloading phenopacket-store release from GitHub")
 
-        ctx = ssl.create_default_context(cafile=certifi.where())
+        ctx = _ssl_context()
         tag_api_url = f"https://api.github.com/repos/{self.config.repo_owner}/{self.config.repo_name}/tags"
         self.logger.debug(f"Fetching tags from {tag_api_url}")
 
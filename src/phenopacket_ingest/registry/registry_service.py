@@ -5,11 +5,12 @@ Registry module for downloading and managing phenopacket data.
 import json
 import logging
 import os
-import zipfile
 from pathlib import Path
 from typing import Optional
 
 from phenopacket_ingest.config import PhenopacketStoreConfig
+from phenopacket_ingest.parser.jsonl_writer import PhenopacketJsonlWriter
+from phenopacket_ingest.parser.phenopacket_extractor import PhenopacketExtractor
 from phenopacket_ingest.parser.phenopacket_parser import PhenopacketParser
 from phenopacket_ingest.registry.downloader import PhenopacketDownloader
 
@@ -53,16 +54,15 @@ class PhenopacketRegistryService:
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.downloader = PhenopacketDownloader(self.config, self.logger)
         self.parser = PhenopacketParser(self.logger)
+        self.extractor = PhenopacketExtractor(self.logger)
 
         self.registry = None
-        HAS_PPKTSTORE = True
         if HAS_PPKTSTORE:
             try:
                 self.registry = configure_phenopacket_registry(store_dir=self.data_dir)
                 self.logger.info("Initialized phenopacket registry")
             except Exception as e:
                 self.logger.error(f"Error initializing registry: {e}")
-                HAS_PPKTSTORE = False
         else:
             self.logger.warning("ppktstore not available. Using fallback implementation.")
 
@@ -74,7 +74,6 @@ class PhenopacketRegistryService:
             Path to the downloaded ZIP file
 
         """
-        global HAS_PPKTSTORE
         if HAS_PPKTSTORE and self.registry:
             self.logger.info("Downloading latest phenopacket-store release")
             try:
@@ -108,12 +107,12 @@ class PhenopacketRegistryService:
 
         output_dir = Path(self.config.output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
+        # Compressed output keeps this name: transform.yaml reads it, and Koza detects gzip by content
         jsonl_path = output_dir / "phenopackets.jsonl"
 
         # Ensure the output directory exists
         os.makedirs(os.path.dirname(jsonl_path), exist_ok=True)
 
-        global HAS_PPKTSTORE
         if HAS_PPKTSTORE:
             try:
                 self._extract_with_ppktstore(zip_path, jsonl_path)
@@ -137,7 +136,10 @@ class PhenopacketRegistryService:
         self.logger.info(f"Extracting phenopacket data from {zip_path} to {jsonl_path}")
 
         try:
-            with zipfile.ZipFile(zip_path) as zf, open(jsonl_path, "w") as f:
+            with (
+                PhenopacketExtractor.open_archive(zip_path) as zf,
+                PhenopacketJsonlWriter(jsonl_path, self.config.shard_by_cohort, self.config.compress_output) as writer,
+            ):
                 store = PhenopacketStore.from_release_zip(zf)
 
                 for cohort in store.cohorts():
@@ -148,7 +150,7 @@ class PhenopacketRegistryService:
                         phenopacket = pp_info.phenopacket
                         record_dict = self.parser.phenopacket_to_jsonl_dict(phenopacket, cohort_name)
                         if record_dict:
-                            f.write(json.dumps(record_dict) + "\n")
+                            writer.write(json.dumps(record_dict), cohort_name)
         except Exception as e:
             self.logger.error(f"Error in _extract_with_ppktstore: {e}")
             raise
@@ -163,38 +165,11 @@ class PhenopacketRegistryService:
 
         """
         self.logger.info(f"Extracting phenopacket data directly from {zip_path} to {jsonl_path}")
-
-        # Check if phenopackets library is available
-        try:
-            from google.protobuf.json_format import Parse
-            from phenopackets import Phenopacket as PBPhenopacket
-        except ImportError:
-            self.logger.error("phenopackets library not available, cannot extract data")
-            raise ImportError("phenopackets library is required for extraction")
-
-        with zipfile.ZipFile(zip_path) as zf, open(jsonl_path, "w") as f:
-            phenopacket_files = [
-                name for name in zf.namelist() if name.endswith('.json') and not name.startswith('__MACOSX')
-            ]
-
-            self.logger.info(f"Found {len(phenopacket_files)} phenopacket files")
-
-            for i, pp_file in enumerate(phenopacket_files):
-                if i % 100 == 0:
-                    self.logger.info(f"Processing file {i + 1}/{len(phenopacket_files)}")
-
-                # Determine cohort name from file path
-                parts = pp_file.split('/')
-                cohort_name = parts[0] if len(parts) > 1 else "unknown"
-
-                try:
-                    # Read and parse the phenopacket
-                    pp_content = zf.read(pp_file).decode('utf-8')
-                    phenopacket = Parse(pp_content, PBPhenopacket())
-
-                    # Convert to JSONL record
-                    record_dict = self.parser.phenopacket_to_jsonl_dict(phenopacket, cohort_name)
-                    if record_dict:
-                        f.write(json.dumps(record_dict) + "\n")
-                except Exception as e:
-                    self.logger.error(f"Error processing {pp_file}: {e}")
+        self.extractor.extract_to_jsonl(
+            zip_path,
+            jsonl_path,
+            force=True,
+            cache_path=self.data_dir / "parsecache.sqlite",
+            shard_by_cohort=self.config.shard_by_cohort,
+            compress=self.config.compress_output,
+        )
@@ -5,20 +5,22 @@ This module provides functionality to transform PhenopacketRecord objects
 into Biolink model entities for knowledge graph integration.
 """
 
-import json
 import logging
-import uuid
-from typing import Any, Dict, List, Optional, Union
+import os
+from itertools import chain
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Optional, Type, TypeVar, Union
 
+from phenopacket_ingest import json_utils
 from phenopacket_ingest.models import (
     Disease,
     PhenopacketRecord,
     PhenotypicFeature,
+    TimeElement,
 )
+from phenopacket_ingest.models.phenopacket import Sex
 
 from biolink_model.datamodel.pydanticmodel_v2 import (
     AgentTypeEnum,
-    BiologicalSex,
     Case,
     CaseToDiseaseAssociation,
     CaseToGeneAssociation,
@@ -26,6 +28,121 @@ from biolink_model.datamodel.pydanticmodel_v2 import (
     KnowledgeLevelEnum,
 )
 
+logger = logging.getLogger(__name__)
+
+# Rows failing validation beyond this many are counted but no longer logged one by one
+MAX_LOGGED_VALIDATION_ERRORS = 100
+
+# Row fields that process_record reads (directly or via the model's derived genes/pmids).
+# Everything else, e.g. biosamples or the observed/excluded copies of the phenotypic
+# features, is skipped during validation unless strict parsing is requested.
+TRANSFORM_FIELDS = frozenset(
+    {
+        "id",
+        "cohort",
+        "subject",
+        "phenotypic_features",
+        "diseases",
+        "interpretations",
+        "genes",
+        "variants",
+        "pmids",
+        "meta_data",
+    }
+)
+
+# Provenance shared by every association this ingest emits
+PRIMARY_KNOWLEDGE_SOURCE = "infores:phenopacket-store"
+KNOWLEDGE_LEVEL = KnowledgeLevelEnum.observation
+AGENT_TYPE = AgentTypeEnum.manual_agent
+
+AssociationT = TypeVar(
+    "AssociationT", CaseToDiseaseAssociation, CaseToGeneAssociation, CaseToPhenotypicFeatureAssociation
+)
+
+# One validated instance per association class, carrying the shared provenance. New associations
+# are copies of it with the per-edge slots filled in, which skips re-validating every slot of the
+# Biolink model for each edge.
+_ASSOCIATION_TEMPLATES = {
+    cls: cls(
+        id="uuid:template",
+        subject="",
+        predicate="",
+        object="",
+        knowledge_level=KNOWLEDGE_LEVEL,
+        agent_type=AGENT_TYPE,
+        primary_knowledge_source=PRIMARY_KNOWLEDGE_SOURCE,
+    )
+    for cls in (CaseToDiseaseAssociation, CaseToGeneAssociation, CaseToPhenotypicFeatureAssociation)
+}
+
+
+def _new_association_id() -> str:
+    """
+    Generate a random ``uuid:`` CURIE for an association.
+
+    Equivalent to ``f"uuid:{uuid.uuid4()}"`` (same canonical version 4 form), but
+    formats the random bytes directly instead of building a UUID object per call.
+    """
+    b = bytearray(os.urandom(16))
+    b[6] = (b[6] & 0x0F) | 0x40  # version 4
+    b[8] = (b[8] & 0x3F) | 0x80  # RFC 4122 variant
+    h = b.hex()
+    return f"uuid:{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def _new_association(
+    cls: Type[AssociationT],
+    subject: str,
+    predicate: str,
+    object: str,
+    publications: Optional[List[str]] = None,
+    **kwargs: Any,
+) -> AssociationT:
+    """
+    Build a case association with the ingest's shared provenance.
+
+    The association is copied from a validated template rather than validated itself,
+    so the values passed in must already have the slot types (strings, bool negated).
+
+    Args:
+        cls: Biolink association class to instantiate
+        subject: ID of the case
+        predicate: Biolink predicate CURIE
+        object: ID of the associated entity
+        publications: PubMed IDs supporting the association
+        **kwargs: Class-specific slots, e.g. onset_qualifier or negated
+
+    Returns:
+        The association, with a fresh uuid: ID
+
+    """
+    template = _ASSOCIATION_TEMPLATES[cls]
+    return template.model_copy(
+        update={
+            "id": _new_association_id(),
+            "category": list(template.category),
+            "subject": subject,
+            "predicate": predicate,
+            "object": object,
+            "publications": list(publications) if publications else None,
+            **kwargs,
+        }
+    )
+
+
+def _onset_duration(onset: Optional[TimeElement]) -> str:
+    """
+    Get the ISO8601 onset age of a phenotypic feature or disease.
+
+    Args:
+        onset: The feature's or disease's onset
+
+    Returns:
+        The ISO8601 duration, or an empty string if there is no onset age
+
+    """
+    return onset.age.iso8601duration if onset and onset.age else ""
 
 
 class PhenopacketTransformer:
@@ -39,51 +156,45 @@ class PhenopacketTransformer:
     - Phenotypic feature associations
     """
 
+    # Number of rows parse_phenopacket has rejected in this process
+    validation_error_count = 0
+
     def __init__(self, logger: Optional[logging.Logger] = None):
         """Initialize the transformer."""
         self.logger = logger or logging.getLogger(__name__)
 
-    @staticmethod
-    def parse_phenopacket(row: Dict[str, Any]) -> Optional[PhenopacketRecord]:
+    @classmethod
+    def parse_phenopacket(
+        cls, row: Dict[str, Any], fields: Optional[AbstractSet[str]] = None
+    ) -> Optional[PhenopacketRecord]:
         """
         Parse and validate a raw JSON row into a PhenopacketRecord.
-        Pre-processes JSON string fields if necessary.
+
+        Fields serialized as JSON strings are decoded by the model's validators. Only the
+        first MAX_LOGGED_VALIDATION_ERRORS failures are logged; later ones are just counted
+        in validation_error_count.
 
         Args:
             row: Dictionary from a JSONL file
+            fields: If given, only these keys of the row are validated; the rest keep their defaults
 
         Returns:
             A validated PhenopacketRecord or None if validation fails
 
         """
-        # Handle fields that might be serialized as strings
-        for field in [
-            "phenotypic_features",
-            "observed_phenotypes",
-            "excluded_phenotypes",
-            "biosamples",
-            "measurements",
-            "medical_actions",
-            "files",
-            "diseases",
-            "interpretations",
-            "meta_data",
-            "external_references",
-            "variant_hgvs",
-            "pmids",
-        ]:
-            if isinstance(row.get(field), str) and row.get(field):
-                try:
-                    row[field] = json.loads(row[field])
-                except json.JSONDecodeError:
-                    # If it's not valid JSON, leave as is
-                    pass
+        if fields is not None:
+            # Walk the (smaller) field set rather than copying and filtering every key of the row
+            row = {k: row[k] for k in fields if k in row}
 
         try:
             record = PhenopacketRecord.model_validate(row)
             return record
         except Exception as e:
-            logging.error(f"Error validating phenopacket record: {e}")
+            cls.validation_error_count += 1
+            if cls.validation_error_count <= MAX_LOGGED_VALIDATION_ERRORS:
+                logger.error("Error validating phenopacket record %s: %s", row.get("id"), e)
+                if cls.validation_error_count == MAX_LOGGED_VALIDATION_ERRORS:
+                    logger.error("Further validation errors will be counted but not logged")
             return None
 
     @staticmethod
@@ -101,9 +212,9 @@ class PhenopacketTransformer:
         if not record.subject.id:
             return None
 
-        biological_sex = None
-        if record.subject.sex:
-            biological_sex = str(record.subject.sex.value)
+        # Sex is a str enum when recognised and the raw string otherwise; either way it is already a str
+        sex = record.subject.sex
+        biological_sex = (sex.value if isinstance(sex, Sex) else sex) or None
 
         # Include cohort in ID for proper URI resolution (see issue #6)
         # Format: phenopacket.store:{cohort}.{id} (dot separator for URL safety, see issue #8)
@@ -123,7 +234,7 @@ class PhenopacketTransformer:
     @staticmethod
     def transform_phenotypic_features(
         case_id: str,
-        phenotypic_features: List[Union[PhenotypicFeature, Dict[str, Any]]],
+        phenotypic_features: List[PhenotypicFeature],
         pmids: Optional[List[str]] = None,
     ) -> List[CaseToPhenotypicFeatureAssociation]:
         """
@@ -141,34 +252,18 @@ class PhenopacketTransformer:
         associations = []
 
         for feature in phenotypic_features:
-            feature_id = feature.id if hasattr(feature, 'id') else feature.get('id')
-            excluded = feature.excluded if hasattr(feature, 'excluded') else feature.get('excluded', False)
-
+            feature_id = feature.type.id
             if not feature_id:
                 continue
 
-            onset = ""  # Default to empty string instead of None
-            if hasattr(feature, 'onset') and feature.onset:
-                if hasattr(feature.onset, 'age') and feature.onset.age:
-                    if hasattr(feature.onset.age, 'iso8601duration'):
-                        onset = feature.onset.age.iso8601duration or ""
-            elif isinstance(feature, dict) and 'onset' in feature and feature['onset']:
-                if isinstance(feature['onset'], dict) and 'age' in feature['onset'] and feature['onset']['age']:
-                    if isinstance(feature['onset']['age'], dict) and 'iso8601duration' in feature['onset']['age']:
-                        onset = feature['onset']['age']['iso8601duration'] or ""
-                    elif isinstance(feature['onset']['age'], str):
-                        onset = feature['onset']['age'] or ""
-            assoc = CaseToPhenotypicFeatureAssociation(
+            assoc = _new_association(
+                CaseToPhenotypicFeatureAssociation,
                 subject=case_id,
-                id=f"uuid:{uuid.uuid4()}",
                 predicate="biolink:has_phenotype",
                 object=feature_id,
-                knowledge_level=KnowledgeLevelEnum.observation,
-                agent_type=AgentTypeEnum.manual_agent,
-                primary_knowledge_source="infores:phenopacket-store",
-                onset_qualifier=str(onset),
-                negated=excluded,
-                publications=pmids if pmids else None,
+                publications=pmids,
+                onset_qualifier=_onset_duration(feature.onset),
+                negated=feature.excluded,
             )
             associations.append(assoc)
 
@@ -176,7 +271,7 @@ class PhenopacketTransformer:
 
     @staticmethod
     def transform_diseases(
-        case_id: str, diseases: List[Union[Disease, Dict[str, Any]]], pmids: Optional[List[str]] = None
+        case_id: str, diseases: List[Disease], pmids: Optional[List[str]] = None
     ) -> List[CaseToDiseaseAssociation]:
         """
         Transform diseases into case-to-disease associations.
@@ -193,40 +288,17 @@ class PhenopacketTransformer:
         associations = []
 
         for disease in diseases:
-            if hasattr(disease, 'id'):
-                disease_id = disease.id
-            elif isinstance(disease, dict):
-                disease_id = disease.get('id', '')
-                if not disease_id and 'term' in disease and isinstance(disease['term'], dict):
-                    disease_id = disease['term'].get('id', '')
-            else:
-                continue
-
+            disease_id = disease.term.id
             if not disease_id:
                 continue
 
-            onset = ""  # Default to empty string instead of None
-            if hasattr(disease, 'onset') and disease.onset:
-                if hasattr(disease.onset, 'age') and disease.onset.age:
-                    if hasattr(disease.onset.age, 'iso8601duration'):
-                        onset = disease.onset.age.iso8601duration or ""
-            elif isinstance(disease, dict) and 'onset' in disease and disease['onset']:
-                if isinstance(disease['onset'], dict) and 'age' in disease['onset'] and disease['onset']['age']:
-                    if isinstance(disease['onset']['age'], dict) and 'iso8601duration' in disease['onset']['age']:
-                        onset = disease['onset']['age']['iso8601duration'] or ""
-                    elif isinstance(disease['onset']['age'], str):
-                        onset = disease['onset']['age'] or ""
-
-            assoc = CaseToDiseaseAssociation(
-                id=f"uuid:{uuid.uuid4()}",
+            assoc = _new_association(
+                CaseToDiseaseAssociation,
                 subject=case_id,
                 predicate="biolink:has_disease",
                 object=disease_id,
-                knowledge_level=KnowledgeLevelEnum.observation,
-                agent_type=AgentTypeEnum.manual_agent,
-                primary_knowledge_source="infores:phenopacket-store",
-                onset_qualifier=str(onset),
-                publications=pmids if pmids else None,
+                publications=pmids,
+                onset_qualifier=_onset_duration(disease.onset),
             )
             associations.append(assoc)
 
@@ -255,63 +327,83 @@ class PhenopacketTransformer:
             if not gene_id:
                 continue
 
-            assoc = CaseToGeneAssociation(
-                id=f"uuid:{uuid.uuid4()}",
+            assoc = _new_association(
+                CaseToGeneAssociation,
                 subject=case_id,
                 predicate="biolink:has_gene",
                 object=gene_id,
-                knowledge_level=KnowledgeLevelEnum.observation,
-                agent_type=AgentTypeEnum.manual_agent,
-                primary_knowledge_source="infores:phenopacket-store",
-                publications=pmids if pmids else None,
+                publications=pmids,
             )
             associations.append(assoc)
 
         return associations
 
     @classmethod
-    def process_record(cls, record: Union[Dict[str, Any], PhenopacketRecord]) -> List[Any]:
+    def iter_entities(
+        cls, record: Union[Dict[str, Any], PhenopacketRecord], strict: bool = False
+    ) -> Iterator[Any]:
         """
-        Process a phenopacket record and transform it into Biolink entities.
+        Transform a phenopacket record into Biolink entities, yielding them as they are built.
 
         Args:
             record: A PhenopacketRecord or dictionary
+            strict: Validate every field of a dictionary record, not just those the transform reads
 
-        Returns:
-            List of Biolink entities
+        Yields:
+            The Case, then its phenotype, disease and gene associations
 
         """
-        entities = []
-
         if isinstance(record, dict):
-            record = cls.parse_phenopacket(record)
-
-        if not record:
-            return entities
+            record = cls.parse_phenopacket(record, fields=None if strict else TRANSFORM_FIELDS)
+            if record is None:
+                return
 
         case = cls.transform_case(record)
-        if not case:
-            return entities
+        if case is None:
+            return
+
+        # A validated record always has these fields (empty lists by default), so no hasattr
+        # probing is needed; empty lists skip the transform call altogether
+        case_id = case.id
+        pmids = record.pmids
+        yield case
+        if record.phenotypic_features:
+            yield from cls.transform_phenotypic_features(case_id, record.phenotypic_features, pmids)
+        if record.diseases:
+            yield from cls.transform_diseases(case_id, record.diseases, pmids)
+        if record.genes:
+            yield from cls.transform_genes(case_id, record.genes, pmids)
 
-        entities.append(case)
+    @classmethod
+    def process_record(cls, record: Union[Dict[str, Any], PhenopacketRecord], strict: bool = False) -> List[Any]:
+        """
+        Process a phenopacket record and transform it into Biolink entities.
 
-        case_id = case.id if hasattr(case, 'id') else case.get('id', '')
+        Args:
+            record: A PhenopacketRecord or dictionary
+            strict: Validate every field of a dictionary record, not just those the transform reads
 
-        if hasattr(record, 'phenotypic_features') and record.phenotypic_features:
-            phenotype_assocs = cls.transform_phenotypic_features(
-                case_id=case_id, phenotypic_features=record.phenotypic_features, pmids=record.pmids
-            )
-            entities.extend(phenotype_assocs)
+        Returns:
+            List of Biolink entities
+
+        """
+        return list(cls.iter_entities(record, strict))
+
+    @classmethod
+    def process_records(cls, records: Iterable[Union[Dict[str, Any], PhenopacketRecord]]) -> List[Any]:
+        """
+        Process a batch of phenopacket records into one list of Biolink entities.
 
-        if hasattr(record, 'diseases') and record.diseases:
-            disease_assocs = cls.transform_diseases(case_id=case_id, diseases=record.diseases, pmids=record.pmids)
-            entities.extend(disease_assocs)
+        This is the unit of work handed to worker processes by the Koza transform.
 
-        if hasattr(record, 'genes') and record.genes:
-            gene_assocs = cls.transform_genes(case_id=case_id, genes=record.genes, pmids=record.pmids)
-            entities.extend(gene_assocs)
+        Args:
+            records: PhenopacketRecords or dictionaries
+
+        Returns:
+            List of Biolink entities for all records, in input order
 
-        return entities
+        """
+        return list(chain.from_iterable(map(cls.iter_entities, records)))
 
     @classmethod
     def process_jsonl_line(cls, line: str) -> List[Any]:
@@ -325,8 +417,4 @@ class PhenopacketTransformer:
             List of Biolink entities
 
         """
-        try:
-            data = json.loads(line)
-            return cls.process_record(data)
-        except Exception as e:
-            raise e
+        return cls.process_record(json_utils.loads(line))
@@ -1,11 +1,62 @@
+import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List
+
 import koza
 from koza.transform import KozaTransform
 
+from phenopacket_ingest.config import get_config
 from phenopacket_ingest.transformer.phenopacket_transformer import PhenopacketTransformer
 
+logger = logging.getLogger(__name__)
+
+# Number of entities collected before handing them to the Koza writer in one call
+WRITE_BATCH_SIZE = 1024
+
+# Rows sent to a worker process per task when PHENOPACKET_TRANSFORM_WORKERS > 1
+ROW_BATCH_SIZE = 256
+
+
+def _row_batches(data: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    rows = iter(data)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def _transform_parallel(koza_app: KozaTransform, data: Iterable[dict], workers: int):
+    # Reading and writing stay in this process; only row batches and their entities cross to the
+    # workers. At most two batches per worker are in flight, and results are written in input order.
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for batch in _row_batches(data, ROW_BATCH_SIZE):
+            pending.append(executor.submit(PhenopacketTransformer.process_records, batch))
+            if len(pending) >= 2 * workers:
+                koza_app.write(*pending.popleft().result())
+
+        while pending:
+            koza_app.write(*pending.popleft().result())
+
+
+@koza.transform()
+def transform(koza_app: KozaTransform, data: Iterable[dict]):
+    workers = get_config().transform_workers
+    if workers > 1:
+        _transform_parallel(koza_app, data, workers)
+        return
+
+    rejected = PhenopacketTransformer.validation_error_count
+    batch = []
+    for row in data:
+        batch += PhenopacketTransformer.iter_entities(row)
+        if len(batch) >= WRITE_BATCH_SIZE:
+            koza_app.write(*batch)
+            batch.clear()
+
+    if batch:
+        koza_app.write(*batch)
 
-@koza.transform_record()
-def transform(koza_app: KozaTransform, row: dict):
-    entities = PhenopacketTransformer.process_record(row)
-    if entities:
-        koza_app.write(*entities)
+    rejected = PhenopacketTransformer.validation_error_count - rejected
+    if rejected:
+        logger.warning("Skipped %d rows that failed validation", rejected)
@@ -1,11 +1,14 @@
 """Test parsing individual entities from a phenopacket."""
 
 import json
+import logging
+import uuid
 
 import pytest
 
-from phenopacket_ingest.models import PhenopacketRecord
+from phenopacket_ingest.models import Disease, PhenopacketRecord, PhenotypicFeature
 from phenopacket_ingest.parser.phenopacket_parser import PhenopacketParser
+from phenopacket_ingest.transformer import phenopacket_transformer
 from phenopacket_ingest.transformer.phenopacket_transformer import PhenopacketTransformer
 
 COMPLETE_PHENOPACKET = {
@@ -130,12 +133,11 @@ COMPLETE_PHENOPACKET = {
 }
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def phenopacket_record():
-    """Create a PhenopacketRecord from the complete phenopacket."""
+    """Create a PhenopacketRecord from the complete phenopacket, once for this module's read-only tests."""
     parser = PhenopacketParser()
     record = parser.parse_from_json(json.dumps(COMPLETE_PHENOPACKET))
-    print(record)
     return PhenopacketRecord.model_validate(record)
 
 
@@ -163,8 +165,9 @@ def test_phenotypic_features_parsing(phenopacket_record):
     features = phenopacket_record.phenotypic_features
 
     assert len(features) == 3
+    by_id = {f.type.id: f for f in features}
 
-    seizure = [f for f in features if f.type.id == "HP:0001250"][0]
+    seizure = by_id["HP:0001250"]
     assert seizure.type.label == "Seizure"
     assert not seizure.excluded
     assert seizure.severity is not None
@@ -177,11 +180,11 @@ def test_phenotypic_features_parsing(phenopacket_record):
     assert len(seizure.evidence) == 1
     assert seizure.evidence[0].evidence_code.id == "ECO:0000033"
 
-    dev_delay = [f for f in features if f.type.id == "HP:0001263"][0]
+    dev_delay = by_id["HP:0001263"]
     assert dev_delay.type.label == "Developmental delay"
     assert not dev_delay.excluded
 
-    microcephaly = [f for f in features if f.type.id == "HP:0000252"][0]
+    microcephaly = by_id["HP:0000252"]
     assert microcephaly.type.label == "Microcephaly"
     assert microcephaly.excluded
 
@@ -377,6 +380,19 @@ def test_biolink_entity_generation(phenopacket_record):
     assert gene_assoc_count == 1, f"Expected 1 CaseToGeneAssociation, got {gene_assoc_count} ({type_counts})"
 
 
+def test_association_ids_are_uuid4(phenopacket_record):
+    """Test that association IDs are canonical version 4 uuid: CURIEs."""
+    entities = PhenopacketTransformer.process_record(phenopacket_record)
+    association_ids = [e.id for e in entities[1:]]
+
+    assert len(set(association_ids)) == len(association_ids)
+    for association_id in association_ids:
+        prefix, _, value = association_id.partition(":")
+        assert prefix == "uuid"
+        assert str(uuid.UUID(value)) == value
+        assert uuid.UUID(value).version == 4
+
+
 def test_case_id_includes_cohort(phenopacket_record):
     """Test that Case ID includes cohort for proper URI resolution (issue #6)."""
     entities = PhenopacketTransformer.process_record(phenopacket_record)
@@ -410,6 +426,68 @@ def test_case_id_without_cohort():
     assert "/" not in case.id.split("phenopacket.store:")[1]
 
 
+def test_transform_features_and_diseases_onset_and_exclusion():
+    """Test that onset ages and exclusion flags of typed features and diseases reach the associations."""
+    case_id = "phenopacket.store:KCNT1.case_1"
+    phenotype_assocs = PhenopacketTransformer.transform_phenotypic_features(
+        case_id,
+        [
+            PhenotypicFeature(type={"id": "HP:0001250"}, onset={"age": {"iso8601duration": "P1Y"}}),
+            PhenotypicFeature(type={"id": "HP:0000252"}, excluded=True),
+        ],
+    )
+    disease_assocs = PhenopacketTransformer.transform_diseases(
+        case_id, [Disease(term={"id": "MONDO:0100038", "label": None}, onset={"age": {"iso8601duration": "P2Y"}})]
+    )
+
+    assert [(a.object, a.negated, a.onset_qualifier) for a in phenotype_assocs] == [
+        ("HP:0001250", False, "P1Y"),
+        ("HP:0000252", True, ""),
+    ]
+    assert [(a.object, a.onset_qualifier) for a in disease_assocs] == [("MONDO:0100038", "P2Y")]
+
+
+def test_parse_phenopacket_caps_validation_error_logging(monkeypatch, caplog):
+    """Test that validation failures are counted but only the first few are logged."""
+    monkeypatch.setattr(phenopacket_transformer, "MAX_LOGGED_VALIDATION_ERRORS", 2)
+    monkeypatch.setattr(PhenopacketTransformer, "validation_error_count", 0)
+
+    for i in range(5):
+        assert PhenopacketTransformer.parse_phenopacket({"id": f"bad_{i}"}) is None
+
+    assert PhenopacketTransformer.validation_error_count == 5
+    messages = [r.getMessage() for r in caplog.records if r.levelno == logging.ERROR]
+    assert len(messages) == 3
+    assert messages[0].startswith("Error validating phenopacket record bad_0")
+    assert messages[-1] == "Further validation errors will be counted but not logged"
+
+
+def test_case_with_unrecognised_sex_string():
+    """Test that a sex value outside the Sex enum is passed through instead of failing."""
+    row = {"id": "case_1", "cohort": "KCNT1", "subject": {"id": "patient:1", "sex": "OTHER_SEX"}}
+    case = PhenopacketTransformer.process_record(row)[0]
+
+    assert case.has_biological_sex == "OTHER_SEX"
+
+
+def test_parse_phenopacket_json_string_fields():
+    """Test that list/object fields serialized as JSON strings are decoded during validation."""
+    row = {
+        "id": "test.strings.1",
+        "subject": {"id": "patient:strings", "sex": "MALE"},
+        "phenotypic_features": json.dumps([{"type": {"id": "HP:0001250", "label": "Seizure"}}]),
+        "diseases": json.dumps([{"term": {"id": "MONDO:0100038", "label": "KCNT1-related epilepsy"}}]),
+        "pmids": json.dumps(["PMID:33146646"]),
+    }
+
+    record = PhenopacketTransformer.parse_phenopacket(row)
+
+    assert record is not None
+    assert record.phenotypic_features[0].id == "HP:0001250"
+    assert record.diseases[0].id == "MONDO:0100038"
+    assert record.pmids == ["PMID:33146646"]
+
+
 if __name__ == "__main__":
     parser = PhenopacketParser()
     record = parser.parse_from_json(json.dumps(COMPLETE_PHENOPACKET))
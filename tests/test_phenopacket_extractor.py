@@ -0,0 +1,199 @@
+"""Test extracting phenopackets from a phenopacket-store ZIP archive to JSONL."""
+
+import gzip
+import json
+import logging
+import sqlite3
+import zipfile
+
+import pytest
+from koza.io.utils import open_resource
+
+from phenopacket_ingest import json_utils
+from phenopacket_ingest.parser.jsonl_writer import PhenopacketJsonlWriter
+from phenopacket_ingest.parser.phenopacket_extractor import PhenopacketExtractor
+
+COHORTS = ["KCNT1", "SCN2A"]
+
+
+def make_phenopacket(cohort: str, index: int) -> dict:
+    """Build a minimal phenopacket in protobuf JSON form."""
+    return {
+        "id": f"{cohort}_case_{index}",
+        "subject": {"id": f"patient:{index}", "sex": "FEMALE"},
+        "phenotypicFeatures": [
+            {"type": {"id": "HP:0001250", "label": "Seizure"}, "onset": {"age": {"iso8601duration": "P1Y"}}},
+            {"type": {"id": "HP:0000252", "label": "Microcephaly"}, "excluded": True},
+        ],
+        "diseases": [{"term": {"id": "MONDO:0100038", "label": "KCNT1-related epilepsy"}}],
+        "metaData": {
+            "created": "2024-01-01T00:00:00Z",
+            "phenopacketSchemaVersion": "2.0",
+            "externalReferences": [{"id": "PMID:33146646"}],
+        },
+    }
+
+
+def write_phenopacket_zip(zip_path, release: str = ""):
+    """Write a ZIP archive with two cohorts of two phenopackets each, optionally under a release folder."""
+    prefix = f"{release}/" if release else ""
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for cohort in COHORTS:
+            zf.writestr(f"{prefix}{cohort}/", "")
+            for i in range(2):
+                zf.writestr(f"{prefix}{cohort}/{cohort}_case_{i}.json", json.dumps(make_phenopacket(cohort, i)))
+        zf.writestr("__MACOSX/KCNT1/._KCNT1_case_0.json", "")
+    return zip_path
+
+
+@pytest.fixture
+def phenopacket_zip(tmp_path):
+    """Create a ZIP archive with two cohorts of two phenopackets each."""
+    return write_phenopacket_zip(tmp_path / "all_phenopackets.zip")
+
+
+def read_jsonl(path):
+    with open(path, "rb") as f:
+        return [json_utils.loads(line) for line in f]
+
+
+def test_extract_to_jsonl(phenopacket_zip, tmp_path):
+    """Test that every phenopacket in the archive becomes one JSONL record."""
+    output_path = PhenopacketExtractor().extract_to_jsonl(phenopacket_zip, tmp_path / "out" / "phenopackets.jsonl")
+    records = read_jsonl(output_path)
+
+    assert [r["id"] for r in records] == ["KCNT1_case_0", "KCNT1_case_1", "SCN2A_case_0", "SCN2A_case_1"]
+    assert {r["cohort"] for r in records} == set(COHORTS)
+
+    record = records[0]
+    assert record["subject_sex"] == "FEMALE"
+    assert len(record["observed_phenotypes"]) == 1
+    assert len(record["excluded_phenotypes"]) == 1
+    assert record["disease_id"] == "MONDO:0100038"
+    assert record["pmids"] == ["PMID:33146646"]
+
+
+def test_extract_to_jsonl_release_layout(tmp_path):
+    """Test that the cohort is taken from the entry's parent folder when cohorts sit under a release folder."""
+    zip_path = write_phenopacket_zip(tmp_path / "all_phenopackets.zip", release="0.1.21")
+    records = read_jsonl(PhenopacketExtractor().extract_to_jsonl(zip_path, tmp_path / "phenopackets.jsonl"))
+
+    assert [r["cohort"] for r in records] == ["KCNT1", "KCNT1", "SCN2A", "SCN2A"]
+
+
+def test_extract_to_jsonl_parse_cache(phenopacket_zip, tmp_path, caplog):
+    """Test that a second extraction is served from the parse cache with identical output."""
+    caplog.set_level(logging.INFO)
+    extractor = PhenopacketExtractor()
+    cache_path = tmp_path / "parsecache.sqlite"
+
+    first = extractor.extract_to_jsonl(phenopacket_zip, tmp_path / "first.jsonl", cache_path=cache_path)
+    assert cache_path.exists()
+    second = extractor.extract_to_jsonl(phenopacket_zip, tmp_path / "second.jsonl", cache_path=cache_path)
+
+    assert first.read_text() == second.read_text()
+    assert "Reused 4/4 records from parse cache" in caplog.text
+
+
+def test_extract_to_jsonl_parse_cache_across_releases(tmp_path, caplog):
+    """Test that unchanged entries are reused from the cache by a new release and stale entries are evicted."""
+    caplog.set_level(logging.INFO)
+    extractor = PhenopacketExtractor()
+    cache_path = tmp_path / "parsecache.sqlite"
+
+    old_release = write_phenopacket_zip(tmp_path / "0.1.20.zip", release="0.1.20")
+    extractor.extract_to_jsonl(old_release, tmp_path / "old.jsonl", cache_path=cache_path)
+
+    new_release = tmp_path / "0.1.21.zip"
+    with zipfile.ZipFile(new_release, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("0.1.21/KCNT1/KCNT1_case_0.json", json.dumps(make_phenopacket("KCNT1", 0)))
+    caplog.clear()
+    extractor.extract_to_jsonl(new_release, tmp_path / "new.jsonl", cache_path=cache_path)
+
+    assert "Reused 1/1 records from parse cache" in caplog.text
+    conn = sqlite3.connect(cache_path)
+    cached = conn.execute("SELECT cohort, filename FROM parsecache").fetchall()
+    conn.close()
+    assert cached == [("KCNT1", "KCNT1_case_0.json")]
+
+
+def test_extract_to_jsonl_strict_matches_fast_path(phenopacket_zip, tmp_path):
+    """Test that reading the JSON directly yields the same records as the protobuf path."""
+    extractor = PhenopacketExtractor()
+
+    fast = extractor.extract_to_jsonl(phenopacket_zip, tmp_path / "fast.jsonl")
+    strict = extractor.extract_to_jsonl(phenopacket_zip, tmp_path / "strict.jsonl", strict=True)
+
+    assert read_jsonl(fast) == read_jsonl(strict)
+
+
+def test_extract_to_jsonl_strict_ignores_non_strict_cache(tmp_path, caplog):
+    """Test that a strict run does not reuse records the unvalidated fast path put in the cache."""
+    caplog.set_level(logging.INFO)
+    extractor = PhenopacketExtractor()
+    cache_path = tmp_path / "parsecache.sqlite"
+
+    zip_path = tmp_path / "all_phenopackets.zip"
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("KCNT1/KCNT1_case_0.json", json.dumps({**make_phenopacket("KCNT1", 0), "bogusField": 1}))
+
+    fast = extractor.extract_to_jsonl(zip_path, tmp_path / "fast.jsonl", cache_path=cache_path)
+    assert len(read_jsonl(fast)) == 1
+
+    caplog.clear()
+    strict = extractor.extract_to_jsonl(zip_path, tmp_path / "strict.jsonl", cache_path=cache_path, strict=True)
+    assert read_jsonl(strict) == []
+    assert "Reused 0/1 records from parse cache" in caplog.text
+
+
+def test_extract_to_jsonl_shard_by_cohort(phenopacket_zip, tmp_path):
+    """Test that sharded extraction writes one file per cohort, a manifest and the combined file."""
+    output_path = tmp_path / "phenopackets.jsonl"
+    PhenopacketExtractor().extract_to_jsonl(phenopacket_zip, output_path, shard_by_cohort=True)
+
+    for cohort in COHORTS:
+        shard = read_jsonl(tmp_path / f"phenopackets.{cohort}.jsonl")
+        assert [r["cohort"] for r in shard] == [cohort, cohort]
+
+    manifest = json.loads((tmp_path / "phenopackets.manifest.json").read_text())
+    assert manifest["records"] == 4
+    assert [s["cohort"] for s in manifest["shards"]] == COHORTS
+
+    assert len(read_jsonl(output_path)) == 4
+
+
+def test_extract_to_jsonl_compress_keeps_jsonl_name(phenopacket_zip, tmp_path):
+    """Test that compressed output under a plain .jsonl name is gzip that Koza's reader opens by content."""
+    output_path = tmp_path / "phenopackets.jsonl"
+    PhenopacketExtractor().extract_to_jsonl(phenopacket_zip, output_path, compress=True)
+
+    assert output_path.read_bytes()[:2] == b"\x1f\x8b"
+    resource = open_resource(output_path)
+    with resource.reader as f:
+        assert len([json_utils.loads(line) for line in f]) == 4
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".jsonl.gz"])
+def test_jsonl_writer_reopens_returning_cohort_shard(tmp_path, suffix):
+    """Test that a cohort that comes back after another one is appended to its shard, not truncated."""
+    output_path = tmp_path / f"phenopackets{suffix}"
+    with PhenopacketJsonlWriter(output_path, shard_by_cohort=True) as writer:
+        for i, cohort in enumerate(["KCNT1", "SCN2A", "KCNT1"]):
+            writer.write(json.dumps({"id": i}), cohort)
+
+    opener = gzip.open if suffix.endswith(".gz") else open
+    with opener(writer.shard_path("KCNT1"), "rt") as f:
+        assert [json_utils.loads(line)["id"] for line in f] == [0, 2]
+    assert writer.record_counts == {"KCNT1": 2, "SCN2A": 1}
+
+
+def test_extract_to_jsonl_gzip(phenopacket_zip, tmp_path):
+    """Test that a .gz output path produces gzip-compressed JSONL, including merged shards."""
+    output_path = tmp_path / "phenopackets.jsonl.gz"
+    PhenopacketExtractor().extract_to_jsonl(phenopacket_zip, output_path, shard_by_cohort=True)
+
+    with gzip.open(output_path) as f:
+        records = [json_utils.loads(line) for line in f]
+    assert len(records) == 4
+    assert (tmp_path / "phenopackets.KCNT1.jsonl.gz").exists()
+    assert (tmp_path / "phenopackets.manifest.json").exists()
@@ -1,10 +1,13 @@
 import importlib.util
+from itertools import islice
 from pathlib import Path
 from typing import Dict, List
 
 import pytest
 from koza.runner import KozaRunner, PassthroughWriter, load_transform
 
+from phenopacket_ingest import json_utils
+
 import logging
 
 logger = logging.getLogger(__name__)
@@ -28,10 +31,14 @@ def load_module_from_path(path: Path):
     return module
 
 
-def run_transform(rows: List[Dict]) -> List:
+@pytest.fixture(scope="session")
+def transform_hooks():
+    """Load the transform script and its Koza hooks once for the whole test session."""
+    return load_transform(load_module_from_path(TRANSFORM_SCRIPT))
+
+
+def run_transform(rows: List[Dict], hooks) -> List:
     """Run the transform on a list of input rows and return the output entities."""
-    module = load_module_from_path(TRANSFORM_SCRIPT)
-    hooks = load_transform(module)
     writer = PassthroughWriter()
     runner = KozaRunner(
         data=iter(rows),
@@ -49,37 +56,35 @@ def get_test_data_path(relative_path: str) -> str:
 
 def load_test_rows(file_path: str, n_rows: int = None, skip_rows: int = 0) -> List[Dict]:
     """Load rows from a JSONL file for testing."""
-    import json
-
-    rows = []
+    stop = None if n_rows is None else skip_rows + n_rows
     with open(file_path, "r") as f:
-        for i, line in enumerate(f):
-            if i < skip_rows:
-                continue
-            if n_rows is not None and len(rows) >= n_rows:
-                break
-            rows.append(json.loads(line))
-    return rows
+        return [json_utils.loads(line) for line in islice(f, skip_rows, stop)]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def phenopacket_test_file() -> str:
     return get_test_data_path("phenopacket_genes.jsonl")
 
 
+@pytest.fixture(scope="session")
+def all_rows(phenopacket_test_file) -> List[Dict]:
+    """Read the test JSONL file once; the row groups are slices of it."""
+    return load_test_rows(phenopacket_test_file)
+
+
 @pytest.fixture
-def row_group_1(phenopacket_test_file) -> List[Dict]:
-    return load_test_rows(phenopacket_test_file, n_rows=3)
+def row_group_1(all_rows) -> List[Dict]:
+    return all_rows[:3]
 
 
 @pytest.fixture
-def row_group_2(phenopacket_test_file) -> List[Dict]:
-    return load_test_rows(phenopacket_test_file, n_rows=4, skip_rows=3)
+def row_group_2(all_rows) -> List[Dict]:
+    return all_rows[3:7]
 
 
 @pytest.fixture
-def row_group_3(phenopacket_test_file) -> List[Dict]:
-    return load_test_rows(phenopacket_test_file, n_rows=3, skip_rows=7)
+def row_group_3(all_rows) -> List[Dict]:
+    return all_rows[7:10]
 
 
 def test_row_group_1_structure(row_group_1):
@@ -90,35 +95,38 @@ def test_row_group_1_structure(row_group_1):
         assert "phenotypic_features" in row
 
 
-def test_transform_produces_entities(row_group_1):
-    """Test that the transform produces output entities."""
-    entities = run_transform(row_group_1)
-    assert len(entities) > 0, "Transform should produce at least one entity"
+@pytest.mark.parametrize("row_group", ["row_group_1", "row_group_2", "row_group_3"])
+def test_transform_produces_entities(row_group, transform_hooks, request):
+    """Test that the transform produces output entities for each group of rows."""
+    entities = run_transform(request.getfixturevalue(row_group), transform_hooks)
+    assert len(entities) > 0, f"Transform should produce entities from {row_group}"
 
 
-def test_transform_produces_case_entities(row_group_1):
+def test_transform_produces_case_entities(row_group_1, transform_hooks):
     """Test that the transform produces Case entities."""
-    entities = run_transform(row_group_1)
+    entities = run_transform(row_group_1, transform_hooks)
     # Check for Case entities (type checking based on the biolink model)
-    case_entities = [e for e in entities if hasattr(e, "has_biological_sex")]
-    assert len(case_entities) > 0, "Transform should produce Case entities"
+    assert any(hasattr(e, "has_biological_sex") for e in entities), "Transform should produce Case entities"
 
 
-def test_transform_produces_associations(row_group_1):
+def test_transform_produces_associations(row_group_1, transform_hooks):
     """Test that the transform produces association entities."""
-    entities = run_transform(row_group_1)
+    entities = run_transform(row_group_1, transform_hooks)
     # Associations have subject/predicate/object
-    associations = [e for e in entities if hasattr(e, "subject") and hasattr(e, "predicate") and hasattr(e, "object")]
-    assert len(associations) > 0, "Transform should produce association entities"
+    assert any(
+        hasattr(e, "subject") and hasattr(e, "predicate") and hasattr(e, "object") for e in entities
+    ), "Transform should produce association entities"
+
 
+def test_parallel_transform_matches_serial(row_group_1, row_group_2, transform_hooks, monkeypatch):
+    """Test that transforming with worker processes yields the same entities, in order."""
+    rows = row_group_1 + row_group_2
+    serial = run_transform(rows, transform_hooks)
 
-def test_row_group_2_transform(row_group_2):
-    """Test transform on second group of rows."""
-    entities = run_transform(row_group_2)
-    assert len(entities) > 0, "Transform should produce entities from row_group_2"
+    monkeypatch.setenv("PHENOPACKET_TRANSFORM_WORKERS", "2")
+    parallel = run_transform(rows, transform_hooks)
 
+    def strip_ids(entities):
+        return [e.model_dump(exclude={"id"}) if hasattr(e, "subject") else e.model_dump() for e in entities]
 
-def test_row_group_3_transform(row_group_3):
-    """Test transform on third group of rows."""
-    entities = run_transform(row_group_3)
-    assert len(entities) > 0, "Transform should produce entities from row_group_3"
+    assert strip_ids(parallel) == strip_ids(serial)